@@ -1,10 +1,11 @@
 import streamlit as st
-from datetime import datetime
 import requests
-# --- MODIFIED IMPORT ---
-from google_trans_new import google_translator
-import json
-import os
+import time
+from itertools import islice
+from journal_core import (
+    LANG_NAMES, LANGUAGES, add_book, append_note, fetch_both, fmt_progress, format_ts, load_data,
+    load_notes, update_book_progress,
+)
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -13,44 +14,37 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Data Persistence ---
-DATA_FILE = "journal_data.json"
-
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {"books": {}}
-
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
 # --- Session State Initialization ---
 if 'journal' not in st.session_state:
     st.session_state.journal = load_data()
+if 'notes' not in st.session_state:
+    st.session_state.notes = {}
+if 'book_order' not in st.session_state:
+    # Ordered titles plus a title -> position map, both only touched when a book is added.
+    st.session_state.book_order = list(st.session_state.journal['books'].keys())
+    st.session_state.book_index = {title: i for i, title in enumerate(st.session_state.book_order)}
 if 'current_book_title' not in st.session_state:
-    book_titles = list(st.session_state.journal['books'].keys())
-    st.session_state.current_book_title = book_titles[0] if book_titles else None
+    book_order = st.session_state.book_order
+    st.session_state.current_book_title = book_order[0] if book_order else None
+
+def get_notes(title):
+    # Each book's notes are read on first access and then kept in session state.
+    if title not in st.session_state.notes:
+        st.session_state.notes[title] = load_notes(title)
+    return st.session_state.notes[title]
 
-def update_book_details():
-    save_data(st.session_state.journal)
-    
-# --- Language Data for New Library ---
-# The new library doesn't provide a built-in dictionary, so we'll create one.
-LANGUAGES = {
-    'hindi': 'hi', 'spanish': 'es', 'french': 'fr', 'german': 'de', 
-    'japanese': 'ja', 'russian': 'ru', 'chinese (simplified)': 'zh-cn'
-}
+def update_book_details(title):
+    # on_change fires before the script reassigns the book dict, so read the new values from the widgets.
+    update_book_progress(title, st.session_state[f"current_page_{title}"], st.session_state[f"total_pages_{title}"])
 
 # --- Sidebar ---
 st.sidebar.title("My Book Collection")
-book_titles = list(st.session_state.journal['books'].keys())
-if book_titles:
-    current_index = book_titles.index(st.session_state.current_book_title) if st.session_state.current_book_title in book_titles else 0
+book_order = st.session_state.book_order
+if book_order:
+    current_index = st.session_state.book_index.get(st.session_state.current_book_title, 0)
     st.session_state.current_book_title = st.sidebar.selectbox(
         "Select a book to view your notes:",
-        options=book_titles,
+        options=book_order,
         index=current_index
     )
 st.sidebar.markdown("---")
@@ -59,11 +53,12 @@ new_book_title = st.sidebar.text_input("Title")
 new_book_author = st.sidebar.text_input("Author")
 if st.sidebar.button("Add Book"):
     if new_book_title and new_book_author:
-        if new_book_title not in st.session_state.journal['books']:
-            st.session_state.journal['books'][new_book_title] = {
-                "author": new_book_author, "current_page": 0, "total_pages": 100, "notes": []
-            }
-            save_data(st.session_state.journal)
+        new_book = {"author": new_book_author, "current_page": 0, "total_pages": 100}
+        # Session state only changes once the database has accepted the book.
+        if new_book_title not in st.session_state.journal['books'] and add_book(new_book_title, new_book):
+            st.session_state.journal['books'][new_book_title] = new_book
+            st.session_state.book_index[new_book_title] = len(st.session_state.book_order)
+            st.session_state.book_order.append(new_book_title)
             st.session_state.current_book_title = new_book_title
             st.rerun()
         else:
@@ -77,16 +72,89 @@ if st.session_state.current_book_title:
     current_book = st.session_state.journal['books'][st.session_state.current_book_title]
     current_book['current_page'] = st.sidebar.number_input(
         "Current Page", min_value=0, value=current_book['current_page'], 
-        key=f"current_page_{st.session_state.current_book_title}", on_change=update_book_details
+        key=f"current_page_{st.session_state.current_book_title}",
+        on_change=update_book_details, args=(st.session_state.current_book_title,)
     )
     current_book['total_pages'] = st.sidebar.number_input(
         "Total Pages", min_value=1, value=current_book['total_pages'],
-        key=f"total_pages_{st.session_state.current_book_title}", on_change=update_book_details
+        key=f"total_pages_{st.session_state.current_book_title}",
+        on_change=update_book_details, args=(st.session_state.current_book_title,)
     )
     if current_book['total_pages'] > 0:
-        progress_percentage = current_book['current_page'] / current_book['total_pages']
+        progress_percentage, progress_text = fmt_progress(current_book['current_page'], current_book['total_pages'])
         st.sidebar.progress(progress_percentage)
-        st.sidebar.write(f"{current_book['current_page']} of {current_book['total_pages']} pages read ({progress_percentage:.0%})")
+        st.sidebar.write(progress_text)
+
+# --- Panels ---
+# Each panel is a fragment, so interacting with it reruns only that panel.
+PAGE_SIZE = 20
+
+def notes_page(title, notes):
+    # `notes` is already newest first.
+    page_count = -(-len(notes) // PAGE_SIZE)
+    page = 1
+    if page_count > 1:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"notes_page_{title}")
+    for note in islice(notes, (page - 1) * PAGE_SIZE, page * PAGE_SIZE):
+        with st.container(border=True):
+            st.write(note["text"])
+            st.caption(f"*Saved on: {format_ts(note['ts'])}*")
+
+@st.fragment
+def notes_panel(title):
+    current_notes = get_notes(title)
+    st.header("My Analysis & Lessons Learned")
+    note_text = st.text_area("What new insights did you gain?", height=200, placeholder="Write your thoughts here...", key=f"note_{title}")
+    if st.button("Add Note to Journal", type="primary"):
+        if note_text:
+            note = {"text": note_text, "ts": int(time.time())}
+            append_note(title, note)
+            current_notes.appendleft(note)
+            st.success("Your note has been successfully saved!")
+        else:
+            st.warning("Please write a note before saving.")
+    st.markdown("---")
+    st.subheader("My Journal Entries")
+    if not current_notes:
+        st.write("Your saved notes for this book will appear here.")
+    else:
+        notes_page(title, current_notes)
+
+@st.fragment
+def word_lookup_panel():
+    st.header("Quick Word Lookup")
+    st.write("Get definitions and translations instantly, right here.")
+    # Stripped up front so whitespace-only input never reaches either API.
+    word_to_lookup = st.text_input("Enter a word to look up:").strip()
+    if word_to_lookup:
+        target_language_name = st.selectbox("Translate to:", options=LANG_NAMES, index=0)
+        if st.button("Look Up"):
+            target_code = LANGUAGES[target_language_name]
+            with st.spinner(f"Looking up '{word_to_lookup}'..."):
+                definition_future, translation_future = fetch_both(word_to_lookup, target_code)
+            st.subheader("Definition (English)")
+            try:
+                data = definition_future.result() if definition_future else None
+            except requests.RequestException as e:
+                st.error(f"Dictionary lookup failed. Error: {e}")
+            else:
+                if data:
+                    st.write(f"**Word:** {data.get('word', 'N/A')}")
+                    if 'phonetic' in data: st.write(f"**Phonetic:** {data.get('phonetic', 'N/A')}")
+                    for meaning in data.get('meanings', []):
+                        st.markdown("---")
+                        st.write(f"**Part of Speech:** {meaning.get('partOfSpeech', 'N/A')}")
+                        for i, definition_info in enumerate(meaning.get('definitions', [])):
+                            st.write(f"{i+1}. {definition_info.get('definition', 'No definition available.')}")
+                else:
+                    st.error("Word not found. Please check the spelling and try again.")
+            st.markdown("---")
+            st.subheader(f"Translation ({target_language_name.capitalize()})")
+            try:
+                translation = translation_future.result()
+                st.success(f"**Translation:** {translation}")
+            except Exception as e:
+                st.error(f"Translation failed. Error: {e}")
 
 # --- Main Page Content ---
 if not st.session_state.current_book_title:
@@ -98,58 +166,6 @@ else:
     st.subheader(f"by {current_book_data['author']}")
     col1, col2 = st.columns([2, 1.5])
     with col1:
-        st.header("My Analysis & Lessons Learned")
-        note_text = st.text_area("What new insights did you gain?", height=200, placeholder="Write your thoughts here...", key=f"note_{st.session_state.current_book_title}")
-        if st.button("Add Note to Journal", type="primary"):
-            if note_text:
-                timestamp = datetime.now().strftime("%B %d, %Y at %I:%M %p")
-                current_book_data['notes'].append({"text": note_text, "ts": timestamp})
-                save_data(st.session_state.journal)
-                st.success("Your note has been successfully saved!")
-            else:
-                st.warning("Please write a note before saving.")
-        st.markdown("---")
-        st.subheader("My Journal Entries")
-        if not current_book_data['notes']:
-            st.write("Your saved notes for this book will appear here.")
-        else:
-            for note in reversed(current_book_data['notes']):
-                with st.container(border=True):
-                    st.write(note["text"])
-                    st.caption(f"*Saved on: {note['ts']}*")
+        notes_panel(st.session_state.current_book_title)
     with col2:
-        st.header("Quick Word Lookup")
-        st.write("Get definitions and translations instantly, right here.")
-        word_to_lookup = st.text_input("Enter a word to look up:")
-        if word_to_lookup:
-            st.subheader("Definition (English)")
-            if st.button("Get Definition"):
-                api_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word_to_lookup}"
-                with st.spinner(f"Looking up '{word_to_lookup}'..."):
-                    response = requests.get(api_url)
-                    if response.status_code == 200:
-                        data = response.json()[0]
-                        st.write(f"**Word:** {data.get('word', 'N/A')}")
-                        if 'phonetic' in data: st.write(f"**Phonetic:** {data.get('phonetic', 'N/A')}")
-                        for meaning in data.get('meanings', []):
-                            st.markdown("---")
-                            st.write(f"**Part of Speech:** {meaning.get('partOfSpeech', 'N/A')}")
-                            for i, definition_info in enumerate(meaning.get('definitions', [])):
-                                st.write(f"{i+1}. {definition_info.get('definition', 'No definition available.')}")
-                    else:
-                        st.error("Word not found. Please check the spelling and try again.")
-            st.markdown("---")
-            st.subheader("Translation")
-            lang_names = list(LANGUAGES.keys())
-            target_language_name = st.selectbox("Translate to:", options=lang_names, index=0)
-            if st.button(f"Translate to {target_language_name.capitalize()}"):
-                target_code = LANGUAGES[target_language_name]
-                with st.spinner("Translating..."):
-                    try:
-                        # --- MODIFIED TRANSLATOR USAGE ---
-                        translator = google_translator()
-                        translation = translator.translate(word_to_lookup, lang_tgt=target_code)
-                        st.success(f"**Translation:** {translation}")
-                    except Exception as e:
-                        st.error(f"Translation failed. Error: {e}")
-
+        word_lookup_panel()
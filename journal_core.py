@@ -0,0 +1,193 @@
+# Storage and word-lookup helpers for app.py. Streamlit re-executes the page
+# script on every interaction, but an imported module (and its caches) is built once.
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google_trans_new import google_translator
+import hashlib
+import mmap
+import orjson
+import os
+import re
+import sqlite3
+from functools import lru_cache
+from urllib.parse import quote
+
+# --- Data Persistence ---
+DB_FILE = "journal.db"
+SCHEMA_VERSION = 1
+# Pre-SQLite storage, imported once when the database is first created.
+DATA_FILE = "journal_data.json"
+NOTES_DIR = "notes"
+TS_FORMAT = "%B %d, %Y at %I:%M %p"
+NOTES_WINDOW = 10_000
+
+# Notes store `ts` as epoch seconds; older notes hold the already formatted string.
+def parse_ts(ts):
+    try:
+        return int(ts)
+    except ValueError:
+        return int(datetime.strptime(ts, TS_FORMAT).timestamp())
+
+@lru_cache(maxsize=4096)
+def format_ts(ts):
+    return datetime.fromtimestamp(ts).strftime(TS_FORMAT)
+
+@lru_cache(maxsize=1024)
+def fmt_progress(current_page, total_pages):
+    progress = current_page / total_pages
+    return progress, f"{current_page} of {total_pages} pages read ({progress:.0%})"
+
+def import_legacy_data(conn):
+    # Runs inside get_db's schema transaction, so any error here rolls the whole import back.
+    if not os.path.exists(DATA_FILE) or os.path.getsize(DATA_FILE) == 0:
+        return
+    # Parse straight from a read-only mapping instead of copying the file into a bytes object first.
+    with open(DATA_FILE, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            data = orjson.loads(view)
+    for title, book in data['books'].items():
+        conn.execute(
+            "INSERT INTO books (title, author, current_page, total_pages) VALUES (?, ?, ?, ?)",
+            (title, book['author'], book['current_page'], book['total_pages'])
+        )
+        # Once a book had a per-book JSONL file its notes lived there; any inline copy is stale.
+        notes_file = os.path.join(NOTES_DIR, hashlib.sha1(title.encode("utf-8")).hexdigest() + ".jsonl")
+        if os.path.exists(notes_file):
+            # Lines stay raw until the loop below, so one torn line can't abort the import.
+            with open(notes_file, "rb") as f:
+                notes = [line for line in f if line.strip()]
+        else:
+            notes = book.get('notes', [])
+        rows = []
+        for note in notes:
+            # An unreadable note (torn line, bad timestamp) is skipped rather than failing the whole import.
+            try:
+                if isinstance(note, bytes):
+                    note = orjson.loads(note)
+                rows.append((title, parse_ts(note['ts']), note['text']))
+            except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                continue
+        conn.executemany("INSERT INTO notes (title, ts, text) VALUES (?, ?, ?)", rows)
+
+@st.cache_resource
+def get_db():
+    # One connection shared by every session; autocommit keeps each statement its own transaction.
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # The schema, the legacy import and the user_version marker commit together, so a
+        # failed import leaves user_version at 0 and is retried on the next start.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS books ("
+                    "title TEXT PRIMARY KEY, author TEXT NOT NULL, "
+                    "current_page INTEGER NOT NULL, total_pages INTEGER NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS notes ("
+                    "id INTEGER PRIMARY KEY, title TEXT NOT NULL REFERENCES books(title), "
+                    "ts INTEGER NOT NULL, text TEXT NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS notes_title ON notes (title, id)")
+                if conn.execute("SELECT NOT EXISTS (SELECT 1 FROM books)").fetchone()[0]:
+                    import_legacy_data(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+def load_data():
+    rows = get_db().execute("SELECT title, author, current_page, total_pages FROM books ORDER BY rowid")
+    return {"books": {
+        title: {"author": author, "current_page": current_page, "total_pages": total_pages}
+        for title, author, current_page, total_pages in rows
+    }}
+
+def add_book(title, book):
+    # Returns False if the title is already taken, e.g. added from another session.
+    cursor = get_db().execute(
+        "INSERT INTO books (title, author, current_page, total_pages) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (title) DO NOTHING",
+        (title, book['author'], book['current_page'], book['total_pages'])
+    )
+    return cursor.rowcount == 1
+
+def load_notes(title):
+    # Newest first, matching display order; new notes go on with appendleft.
+    # Only the newest NOTES_WINDOW notes are kept in memory; older ones stay in the database.
+    rows = get_db().execute(
+        "SELECT ts, text FROM notes WHERE title = ? ORDER BY id DESC LIMIT ?", (title, NOTES_WINDOW)
+    )
+    return deque(({"text": text, "ts": ts} for ts, text in rows), maxlen=NOTES_WINDOW)
+
+def append_note(title, note):
+    get_db().execute("INSERT INTO notes (title, ts, text) VALUES (?, ?, ?)", (title, note['ts'], note['text']))
+
+def update_book_progress(title, current_page, total_pages):
+    get_db().execute(
+        "UPDATE books SET current_page = ?, total_pages = ? WHERE title = ?",
+        (current_page, total_pages, title)
+    )
+
+# --- Languages ---
+# google_trans_new ships no language table, so the translation targets are listed here.
+LANGUAGES = {
+    'hindi': 'hi', 'spanish': 'es', 'french': 'fr', 'german': 'de', 
+    'japanese': 'ja', 'russian': 'ru', 'chinese (simplified)': 'zh-cn'
+}
+LANG_NAMES = tuple(LANGUAGES)
+
+# --- Word Lookup ---
+# Anything else can't be a dictionary headword, so it isn't worth a round trip.
+WORD_RE = re.compile(r"^[A-Za-z][A-Za-z'\-]{0,48}$")
+
+@st.cache_resource
+def get_http():
+    # One pooled session per process so later lookups reuse the open TLS connection.
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4, pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    ))
+    return session
+
+@st.cache_data(ttl=86400, max_entries=10_000, show_spinner=False)
+def lookup_definition(word):
+    api_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{quote(word)}"
+    response = get_http().get(api_url, timeout=5)
+    if response.status_code == 404:
+        return None
+    # Anything else unexpected (429, 5xx) raises, so the failure is reported and not cached.
+    response.raise_for_status()
+    return response.json()[0]
+
+@st.cache_resource
+def get_translator():
+    return google_translator()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def translate_cached(word, target_code):
+    return get_translator().translate(word, lang_tgt=target_code)
+
+def fetch_both(word, target_code):
+    # Both calls are network-bound, so running them side by side costs max(t_dict, t_translate).
+    # Workers get this run's context so the cached functions behave as on the main thread.
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=2, initializer=add_script_run_ctx, initargs=(None, ctx)) as pool:
+        definition_future = pool.submit(lookup_definition, word.lower()) if WORD_RE.match(word) else None
+        translation_future = pool.submit(translate_cached, word, target_code)
+    return definition_future, translation_future